@@ -6,7 +6,9 @@ from prompt_toolkit.history import InMemoryHistory
 
 from itask.completer import ITaskCompleter
 from itask.config import Config
-from itask.task import TaskError, TaskHelper
+from itask.profiling import Profiler
+from itask.review import ReviewQueue
+from itask.task import MultiTaskHelper, TaskError, TaskHelper
 from itask.utils import ObjectDecorator
 
 if prompt_toolkit.__version__ >= '2.0.0':
@@ -61,10 +63,19 @@ class ITask(object):
 
     def __init__(self, _cfg):
         self._cfg = _cfg
-        self._task = TaskHelper(bin_path=_cfg.task_bin, rc_path=_cfg.task_rc)
+        self._profiler = Profiler(_cfg.profile_dir, enabled=_cfg.profile)
+        if _cfg.task_databases:
+            self._task = MultiTaskHelper([TaskHelper(bin_path=_cfg.task_bin, rc_path=rc_path,
+                                                     label=label)
+                                          for label, rc_path in _cfg.task_databases],
+                                         profiler=self._profiler)
+        else:
+            self._task = TaskHelper(bin_path=_cfg.task_bin, rc_path=_cfg.task_rc,
+                                    profiler=self._profiler)
         self._use_gtd = True
 
-        if self._cfg.gtd_review_uda not in self._task.fetch_lines('_udas'):
+        if not all(self._cfg.gtd_review_uda in udas
+                   for udas in self._task.fetch_lines_by_source('_udas').values()):
             if self.ask_bool(f"review UDA '{self._cfg.gtd_review_uda}' does not exist."
                              f" Create?", default=True):
                 self._task.config("uda.reviewed.type", "date", confirm=False)
@@ -73,6 +84,11 @@ class ITask(object):
                 self.print("review UDA not present. Respective macros will be disabled")
                 self._use_gtd = False
 
+        self._review_queue = None
+        if self._use_gtd:
+            self._review_queue = ReviewQueue(self._task, self._cfg.gtd_review_uda,
+                                             self._cfg.gtd_review_interval)
+
         self._macros = {f"{Macro.prefix}{macro.name}": macro
                         for macro in map(self.__getattribute__, dir(self))
                         if isinstance(macro, Macro) and (self._use_gtd or not macro.gtd)}
@@ -119,6 +135,11 @@ class ITask(object):
                     self.error(f"unrecognized input '{inp}'")
 
     def prompt(self, message, default="", rmessage=None):
+        with self._profiler.track('prompt'):
+            inp = self._prompt(message, default=default, rmessage=rmessage)
+        return shlex.split(inp)
+
+    def _prompt(self, message, default="", rmessage=None):
         if prompt_toolkit.__version__ >= '2.0.0':
             gen_rprompt = None if rmessage is None else (lambda: f'macro: {rmessage}')
             # TODO https://github.com/jonathanslenders/python-prompt-toolkit/issues/665
@@ -132,16 +153,18 @@ class ITask(object):
                          get_rprompt_tokens=gen_rprompt, style=self._prompt_style,
                          display_completions_in_columns=self._cfg.complete_display == 'multi',
                          complete_while_typing=self._cfg.complete_while_typing)
-        return shlex.split(inp)
+        return inp
 
     def _pre_report(self, *args):
-        self._task.run(*args, self._cfg.macro_selection_pre_report)
+        self._task.stream(*args, self._cfg.macro_selection_pre_report,
+                          max_lines=self._cfg.macro_report_max_lines)
 
     def _per_report(self, *args):
-        self._task.run(*args, self._cfg.macro_selection_per_report)
+        self._task.stream(*args, self._cfg.macro_selection_per_report)
 
     def _post_report(self, *args):
-        self._task.run(*args, self._cfg.macro_selection_post_report)
+        self._task.stream(*args, self._cfg.macro_selection_post_report,
+                          max_lines=self._cfg.macro_report_max_lines)
 
     @Macro(name='add', signature='CMDs', meta='prompt `add CMDs ...` until aborted')
     def macro_add(self, name, *args):
@@ -155,11 +178,18 @@ class ITask(object):
             self._task.run(*cmds, *inp)
 
     @Macro(name='iter', signature='FILTERs', meta='prompt for each task in selection')
-    def macro_iter(self, name, *args, post_callback=None):
-        tids = self._task.fetch_lines(*args, "_ids")
+    def macro_iter(self, name, *args, post_callback=None, tids=None):
+        preselected = tids is not None
+        if not preselected:
+            tids = self._task.fetch_ids(*args)
         if not tids:
             return
-        self._pre_report(*args)
+        if preselected:
+            # report pre-selected tasks by themselves instead of re-evaluating the filter
+            for source_tids in self._task.split_by_source(tids):
+                self._pre_report(*source_tids)
+        else:
+            self._pre_report(*args)
         # TODO use progress bar?
         for tid in tids:
             self._per_report(tid)
@@ -192,9 +222,12 @@ class ITask(object):
     def macro_gtd_review(self, name, *args):
         def _update_reviewed_uda(tid):
             self._task.run(tid, "modify", f'{self._cfg.gtd_review_uda}:now', show=False)
+            self._review_queue.invalidate()
         filter_expr = self._review_filter(self._cfg.gtd_review_uda, self._cfg.gtd_review_interval)
+        # additional filters can not be answered by the review queue
+        tids = None if args else list(self._review_queue)
         self.macro_iter(name, filter_expr,
-                        *args, post_callback=_update_reviewed_uda)
+                        *args, post_callback=_update_reviewed_uda, tids=tids)
 
     @Macro(name='inbox-add', signature='CMDs', meta='prompt to add inbox tasks until aborted')
     def macro_inbox_add(self, name, *args):
@@ -210,7 +243,7 @@ class ITask(object):
     @Macro(name='edit', signature=f'FILTERs',
            meta='iterate selected tasks and in-place edit description')
     def macro_edit(self, name, *args):
-        tids = self._task.fetch_lines(*args, "_ids")
+        tids = self._task.fetch_ids(*args)
         if not tids:
             return
         self._pre_report(*args)
@@ -230,27 +263,40 @@ class ITask(object):
                 self.print("skipping edit")
             self._per_report(tid)
 
+    def _loop_message(self):
+        if self._review_queue is not None and self._cfg.gtd_review_prompt:
+            try:
+                return f"task [review: {len(self._review_queue)}]> "
+            except TaskError as e:
+                self.error(f"failed to update review queue: {e}")
+        return "task> "
+
     def loop(self):
         print_formatted_text("Welcome to itask, an interactive shell for task")
         try:
             while True:
                 try:
-                    inp = self.prompt("task> ")
+                    inp = self.prompt(self._loop_message())
                     try:
                         if inp and inp[0].startswith(Macro.prefix):
                             (macro_name, *args) = inp
                             if macro_name in self._macros:
                                 try:
-                                    self._macros[macro_name](macro_name, *args)
+                                    with self._profiler.profile(macro_name):
+                                        self._macros[macro_name](macro_name, *args)
                                 except EOFError:
                                     self.print(f"EOF: stopping {macro_name}")
                             else:
                                 self.error("unknown macro")
                                 continue
                         else:
-                            self._task.run(*inp)
+                            with self._profiler.profile('task'):
+                                self._task.run(*inp)
                     except TaskError as e:
                         self.error(str(e))
+                    finally:
+                        if self._review_queue is not None:
+                            self._review_queue.invalidate()
                 except KeyboardInterrupt:
                     pass
         except EOFError:
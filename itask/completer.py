@@ -42,18 +42,35 @@ class ITaskCompleter(Completer):
             display = text
         return Completion(text, display=display, display_meta=meta)
 
+    def _fetch_by_item(self, *args):
+        # maps each fetched item to the labels of the databases it originates from
+        items = {}
+        for label, lines in self._task.fetch_lines_by_source(*args).items():
+            for line in lines:
+                items.setdefault(line, [])
+                if label is not None:
+                    items[line].append(label)
+        return items
+
+    @staticmethod
+    def _sources_meta(labels):
+        return f"[{', '.join(labels)}]" if labels else None
+
     def _update_cache(self):
         # TODO async
+        projects = self._fetch_by_item("_projects")
         self._projects = {
-            prefix: [self._completion(f'{prefix}{project}')
-                     for project in self._task.fetch_lines("_projects")]
+            prefix: [self._completion(f'{prefix}{project}', meta=self._sources_meta(labels))
+                     for project, labels in projects.items()]
             for prefix in self._project_prefixes
         }
 
-        tags = list(filter(lambda t: not all(c.isupper() for c in t),
-                           self._task.fetch_lines("_tags")))
-        self._pos_tags = [self._completion(f'+{tag}') for tag in tags]
-        self._neg_tags = [self._completion(f'-{tag}') for tag in tags]
+        tags = {tag: labels for tag, labels in self._fetch_by_item("_tags").items()
+                if not all(c.isupper() for c in tag)}
+        self._pos_tags = [self._completion(f'+{tag}', meta=self._sources_meta(labels))
+                          for tag, labels in tags.items()]
+        self._neg_tags = [self._completion(f'-{tag}', meta=self._sources_meta(labels))
+                          for tag, labels in tags.items()]
 
     def _completions(self, word):
         yield from self._cmds
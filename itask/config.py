@@ -35,10 +35,25 @@ class Config:
             raise configargparse.ArgumentTypeError(f"{value} is not a valid UDA")
         return value
 
+    @staticmethod
+    def _type_line_count(value):
+        if not re.fullmatch(r'[0-9]+', value):
+            raise configargparse.ArgumentTypeError(f"{value} is not a valid number of lines")
+        return int(value)
+
+    @staticmethod
+    def _type_database(value):
+        (label, sep, rc_path) = value.partition('=')
+        if not sep or not re.fullmatch(r'[a-zA-Z_]+', label) or len(rc_path) == 0:
+            raise configargparse.ArgumentTypeError(f"{value} is not a valid database (LABEL=RC)")
+        return label, rc_path
+
     def _type_rel_date(value):
-        # TODO check date format properly
-        if len(value) == 0 or not re.fullmatch(r'[a-zA-Z0-9\+]+', value):
-            raise configargparse.ArgumentTypeError(f"{value} is not a valid date")
+        # the review interval is applied by the review queue, hence it has to be understood here
+        try:
+            utils.parse_duration(value)
+        except ValueError as e:
+            raise configargparse.ArgumentTypeError(str(e))
         return value
 
     @staticmethod
@@ -68,6 +83,13 @@ class Config:
         excl.add_argument('-d', '--debug', action='store_true', default=False)
         grp.add_argument('--task-rc', type=str)
         grp.add_argument('--task-bin', type=str, default='task')
+        grp.add_argument('--task-databases', type=Config._type_database, nargs='+',
+                         metavar='LABEL=RC',
+                         help="attach several taskwarrior databases (replaces --task-rc)."
+                              " Commands without labelled task IDs run against the first one. "
+                              # TODO https://github.com/bw2/ConfigArgParse/issues/95
+                              "WARNING: database-lists can not yet be saved,"
+                              " due to a bug in ConfigArgParse")
 
         grp = parser.add_argument_group('auto-complete')
         add_bool(grp, 'complete-while-typing', True,
@@ -80,6 +102,13 @@ class Config:
                          help='either display completions side-by-side with their explanation,'
                               'or more completions at once')
 
+        grp = parser.add_argument_group('profiling')
+        add_bool(grp, 'profile', False,
+                 help="profile macros and commands (cProfile, tracemalloc) and write reports")
+        grp.add_argument('--profile-dir', type=str,
+                         default=os.path.join('~', '.itask', 'profiles'),
+                         help="directory to write per-session profile reports to")
+
         grp = parser.add_argument_group('getting-things-done'
                                         ' (https://gettingthingsdone.com/five-steps/)')
         grp.add_argument('--gtd-capture-tags', default=['inbox'], type=Config._type_tag, nargs='+',
@@ -91,6 +120,8 @@ class Config:
                          help="UDA used to store the last review time")
         grp.add_argument('--gtd-review-interval', default='1week', type=Config._type_rel_date,
                          help="minimum interval for reviewing tasks")
+        add_bool(grp, 'gtd-review-prompt', True,
+                 help="show the number of tasks due for review in the prompt")
 
         grp = parser.add_argument_group('macros')
         grp.add_argument('--macro-selection-pre-report', default='ls', type=Config._type_report,
@@ -99,6 +130,8 @@ class Config:
                          help="report for displaying task details per iteration")
         grp.add_argument('--macro-selection-post-report', default='ls', type=Config._type_report,
                          help="report for displaying affected tasks after processing")
+        grp.add_argument('--macro-report-max-lines', default=0, type=Config._type_line_count,
+                         help="truncate pre- and post-reports after this many lines (0: unlimited)")
         return parser
 
     @property
@@ -117,7 +150,8 @@ class Config:
 
     def write_config_file(self):
         # TODO https://github.com/bw2/ConfigArgParse/issues/95
-        not_saveable = {"gtd_capture_tags", "config"}.intersection(self._args.__dict__.keys())
+        not_saveable = {"gtd_capture_tags", "task_databases", "config"}.intersection(
+            self._args.__dict__.keys())
         if not_saveable:
             logging.warning("options ({}) can not be saved".format(
                 ', '.join(map(lambda s: s.replace('_', '-'), not_saveable)))
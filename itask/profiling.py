@@ -0,0 +1,110 @@
+import cProfile
+import contextlib
+import io
+import os
+import pstats
+import time
+import tracemalloc
+import logging
+from collections import defaultdict
+
+logger = logging.getLogger('itask')
+
+
+class Profiler:
+    """Profiles macro invocations and command dispatch of an itask session.
+
+    Every profiled label (e.g. a macro name) accumulates its cProfile statistics and
+    wall-clock time over the whole session. Time spent in `task` subprocesses and in prompt
+    rendering is tracked separately via `track`, so that the remainder can be attributed to
+    Python code. Reports are written to `<profile_dir>/<session>/<label>.{prof,txt}` after
+    every invocation.
+    """
+    categories = ('subprocess', 'prompt')
+
+    def __init__(self, profile_dir=None, enabled=False, top_allocations=10):
+        assert not enabled or profile_dir is not None
+        self.enabled = enabled
+        self._session_dir = None if profile_dir is None else \
+            os.path.join(os.path.expanduser(profile_dir), time.strftime('%Y%m%d-%H%M%S'))
+        self._top_allocations = top_allocations
+        self._label = None
+        self._profiles = {}
+        self._stats = defaultdict(lambda: defaultdict(float))
+        self._allocations = {}
+
+    @contextlib.contextmanager
+    def track(self, category):
+        """Attribute the time spent within the context to `category` of the current label."""
+        if not self.enabled or self._label is None:
+            yield
+            return
+        assert category in Profiler.categories
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._stats[self._label][category] += time.perf_counter() - start
+
+    @contextlib.contextmanager
+    def profile(self, label):
+        """Profile the code within the context and write the accumulated report for `label`."""
+        if not self.enabled or self._label is not None:
+            yield
+            return
+        self._label = label
+        profile = self._profiles.setdefault(label, cProfile.Profile())
+        started_tracing = not tracemalloc.is_tracing()
+        # without reset_peak (Python < 3.9) an existing trace only knows its overall peak
+        measure_peak = started_tracing or hasattr(tracemalloc, 'reset_peak')
+        if started_tracing:
+            tracemalloc.start()
+        elif measure_peak:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            stats = self._stats[label]
+            stats['calls'] += 1
+            stats['total'] += time.perf_counter() - start
+            if measure_peak:
+                stats['peak_memory'] = max(stats['peak_memory'],
+                                           tracemalloc.get_traced_memory()[1])
+            self._allocations[label] = tracemalloc.take_snapshot().statistics('lineno')
+            if started_tracing:
+                tracemalloc.stop()
+            self._label = None
+            try:
+                self._write_report(label)
+            except OSError as e:
+                logger.warning(f"failed to write profile report for '{label}': {e}")
+
+    def _write_report(self, label):
+        os.makedirs(self._session_dir, exist_ok=True)
+        base_path = os.path.join(self._session_dir, label.lstrip('%') or 'task')
+
+        profile = self._profiles[label]
+        profile.dump_stats(f'{base_path}.prof')
+
+        stats = self._stats[label]
+        python_time = stats['total'] - sum(stats[category] for category in Profiler.categories)
+        out = io.StringIO()
+        out.write(f"label:       {label}\n"
+                  f"calls:       {int(stats['calls'])}\n"
+                  f"total:       {stats['total']:.3f}s\n"
+                  f"subprocess:  {stats['subprocess']:.3f}s\n"
+                  f"prompt:      {stats['prompt']:.3f}s\n"
+                  f"python:      {python_time:.3f}s\n"
+                  f"peak memory: {stats['peak_memory'] / 1024:.1f} KiB\n\n")
+        out.write(f"top {self._top_allocations} allocations (last call):\n")
+        for stat in self._allocations[label][:self._top_allocations]:
+            out.write(f"  {stat}\n")
+        out.write("\n")
+        pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(30)
+
+        with open(f'{base_path}.txt', 'w') as fh:
+            fh.write(out.getvalue())
+        logger.info(f"profile report written to {base_path}.txt")
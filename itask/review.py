@@ -0,0 +1,91 @@
+import json
+import time
+import logging
+
+from itask.task import TaskError
+from itask.utils import parse_duration
+
+logger = logging.getLogger('itask')
+
+
+class ReviewQueue:
+    """Tasks due for review, ordered by their review UDA (never reviewed tasks first).
+
+    The queue holds all pending and waiting tasks with their review timestamps. It is built
+    once and, after `invalidate`, updated incrementally from the tasks modified since the last
+    update. The review interval is applied whenever the queue is counted or iterated, so tasks
+    becoming due over time are picked up without querying task again.
+    """
+    status_filter = '(+PENDING or +WAITING)'
+
+    def __init__(self, task, uda, interval):
+        self._task = task
+        self._uda = uda
+        self._interval = parse_duration(interval)
+        self._entries = {}
+        self._synced = None
+        self._stale = False
+
+    @staticmethod
+    def _timestamp(seconds):
+        # same format as the dates of `task export`, hence comparable as strings
+        return time.strftime('%Y%m%dT%H%M%SZ', time.gmtime(seconds))
+
+    def _export(self, *args):
+        tasks = {}
+        for label, lines in self._task.fetch_lines_by_source('rc.verbose:nothing',
+                                                             'rc.json.array:on',
+                                                             *args, 'export').items():
+            try:
+                tasks[label] = json.loads(''.join(lines) or '[]')
+            except ValueError as e:
+                raise TaskError(f"could not parse export of {label or 'task'}: {e}")
+        return tasks
+
+    def _add(self, tasks):
+        for label, source_tasks in tasks.items():
+            for task in source_tasks:
+                self._entries[(label, task['uuid'])] = (task.get(self._uda, ''), task['entry'])
+
+    def _rebuild(self):
+        # taskwarrior timestamps have a resolution of seconds
+        synced = time.time() - 1
+        self._entries = {}
+        self._add(self._export(self.status_filter))
+        self._synced = synced
+        self._stale = False
+        logger.debug(f"review queue rebuilt: {len(self._entries)} tasks")
+
+    def _update(self):
+        synced = time.time() - 1
+        modified = f'modified.after:{self._timestamp(self._synced)}'
+        changed = self._export(modified)
+        if any(changed.values()):
+            for label, tasks in changed.items():
+                for task in tasks:
+                    self._entries.pop((label, task['uuid']), None)
+            self._add(self._export(modified, self.status_filter))
+        self._synced = synced
+        self._stale = False
+        logger.debug(f"review queue updated: {len(self._entries)} tasks")
+
+    def _refresh(self):
+        if self._synced is None:
+            self._rebuild()
+        elif self._stale:
+            self._update()
+
+    def _due(self):
+        self._refresh()
+        cutoff = self._timestamp(time.time() - self._interval)
+        return [key for key, (reviewed, _) in self._entries.items() if reviewed < cutoff]
+
+    def invalidate(self):
+        self._stale = True
+
+    def __len__(self):
+        return len(self._due())
+
+    def __iter__(self):
+        for label, uuid in sorted(self._due(), key=self._entries.get):
+            yield self._task.qualify(label, uuid[:8])
@@ -1,6 +1,13 @@
+import contextlib
+import re
+import shutil
 import subprocess
 import os
+import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from itask.profiling import Profiler
 
 logger = logging.getLogger('itask')
 
@@ -10,7 +17,9 @@ class TaskError(Exception):
 
 
 class TaskHelper:
-    def __init__(self, bin_path='task', rc_path=None, rc_overrides=None, test_mode=False):
+    def __init__(self, bin_path='task', rc_path=None, rc_overrides=None, test_mode=False,
+                 profiler=None, label=None):
+        self.label = label
         self._task_base_args = [bin_path]
         if rc_path is not None:
             self._task_base_args.append(f'rc:{os.path.expanduser(rc_path)}')
@@ -19,6 +28,8 @@ class TaskHelper:
                 f'rc.{name}:{value}' for name, value in rc_overrides.items()
             ])
         self._test_mode = test_mode
+        self._profiler = profiler if profiler is not None else Profiler()
+        self._color = None
 
     @staticmethod
     def _check_output(args):
@@ -28,11 +39,31 @@ class TaskHelper:
     def _call(args):
         return subprocess.call(args, stderr=subprocess.STDOUT)
 
+    @staticmethod
+    def _popen(args):
+        return subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+
+    @staticmethod
+    def _pipe(proc, out, max_lines=None):
+        truncated = 0
+        with proc:
+            for n, line in enumerate(proc.stdout):
+                if max_lines and n >= max_lines:
+                    truncated += 1
+                    continue
+                out.write(line.decode())
+                out.flush()
+        if truncated:
+            out.write(f"... {truncated} more lines truncated\n")
+            out.flush()
+        return proc.returncode
+
     def _exec(self, func, *args):
         try:
             _args = [*self._task_base_args, *args]
             logging.debug(f"shell: `{' '.join(_args)}`")
-            return func(_args)
+            with self._profiler.track('subprocess'):
+                return func(_args)
         except IOError as e:
             raise TaskError(f"command `{' '.join(_args)}` resulted in IOError {e.errno}: {e}")
         except subprocess.CalledProcessError as e:
@@ -48,14 +79,198 @@ class TaskHelper:
         logger.debug(f"fetched: [{', '.join(map(repr, lines))}]")
         return lines
 
+    def fetch_lines_by_source(self, *args):
+        return {self.label: self.fetch_lines(*args)}
+
+    def fetch_ids(self, *args):
+        return self.fetch_lines(*args, "_ids")
+
+    @staticmethod
+    def qualify(label, tid):
+        # a single database does not need qualified IDs
+        return tid
+
+    @staticmethod
+    def split_by_source(tids):
+        return [list(tids)] if tids else []
+
     def run(self, *args, show=True):
         _show = self._call if show and not self._test_mode else self._check_output
         return self._exec(_show, *args)
 
+    @property
+    def color(self):
+        if self._color is None:
+            self._color = self.fetch("_get", "rc.color").lower() in ('on', 'yes', 'y', '1', 'true')
+        return self._color
+
+    def spawn(self, *args, out=None):
+        """Start task with piped output, formatted for being written to `out`."""
+        out = sys.stdout if out is None else out
+        pre_args = []
+        if out.isatty():
+            # task disables colors and falls back to its default width when piped
+            pre_args.append(f"rc.defaultwidth:{shutil.get_terminal_size().columns}")
+            if self.color:
+                pre_args.append("rc._forcecolor:on")
+        return self._exec(self._popen, *pre_args, *args)
+
+    def stream(self, *args, out=None, max_lines=None):
+        """Like `run`, but pipe output to `out` line by line as it arrives.
+
+        At most `max_lines` lines are written; the remainder is drained and only counted,
+        so memory use does not depend on the size of the report.
+        """
+        out = sys.stdout if out is None else out
+        assert max_lines is None or max_lines >= 0
+        proc = self.spawn(*args, out=out)
+        with self._profiler.track('subprocess'):
+            return self._pipe(proc, out, max_lines)
+
     def config(self, *args, confirm=None, verbose=None):
         pre_args = []
         for flag, opt in zip([confirm, verbose], ['rc.confirmation', 'rc.verbose']):
             if flag is not None:
                 assert isinstance(flag, bool)
                 pre_args.append(f"{opt}:{['no', 'yes'][flag]}")
+        # the configuration may have changed any cached setting
+        self._color = None
         return self.run(*pre_args, "config", *args)
+
+
+class MultiTaskHelper:
+    """Combines several labelled `TaskHelper`s, i.e. taskwarrior databases, into one.
+
+    Selections, reports and other read-only commands fan out concurrently across all
+    databases. Task IDs returned by `fetch_ids` are qualified as `<label>/<id>`; commands
+    containing qualified IDs, or a bare `<label>/`, are routed to the respective database. Any
+    other command, e.g. `add`, is run against the first (primary) database.
+    """
+    separator = '/'
+    # task ID or (short) UUID, optionally followed by a DOM attribute, e.g. `3.description`
+    _tid_pattern = re.compile(r'(\d+|[0-9a-fA-F]{8}(-[0-9a-fA-F]{4}){3}-[0-9a-fA-F]{12}'
+                              r'|[0-9a-fA-F]{8})(\.[\w.]+)?')
+    # command categories of `task _zshcommands` which do not modify any data
+    read_only_categories = ('report', 'metadata', 'graphs')
+
+    def __init__(self, helpers, profiler=None):
+        assert helpers and all(helper.label is not None for helper in helpers)
+        self._helpers = helpers
+        self._by_label = {helper.label: helper for helper in helpers}
+        assert len(self._by_label) == len(helpers), "database labels must be unique"
+        self._profiler = profiler if profiler is not None else Profiler()
+        self._executor = ThreadPoolExecutor(max_workers=len(helpers))
+        self._command_categories = None
+
+    @property
+    def primary(self):
+        return self._helpers[0]
+
+    def qualify(self, label, tid):
+        return f'{label}{self.separator}{tid}'
+
+    def split_by_source(self, tids):
+        groups = {}
+        for tid in tids:
+            groups.setdefault(tid.partition(self.separator)[0], []).append(tid)
+        return list(groups.values())
+
+    def _route(self, args):
+        helper = None
+        routed_args = []
+        for arg in args:
+            label, sep, rest = arg.partition(self.separator)
+            if sep and label in self._by_label and \
+                    (len(rest) == 0 or self._tid_pattern.fullmatch(rest)):
+                if helper is not None and helper is not self._by_label[label]:
+                    raise TaskError(f"command `{' '.join(args)}` spans multiple databases")
+                helper = self._by_label[label]
+                if len(rest) == 0:
+                    continue
+                arg = rest
+            routed_args.append(arg)
+        return helper, routed_args
+
+    def _is_read_only(self, args):
+        if self._command_categories is None:
+            self._command_categories = dict(line.split(':', 2)[:2] for line
+                                            in self.primary.fetch_lines('_zshcommands'))
+        for arg in args:
+            # task accepts unambiguous abbreviations of commands
+            matches = [arg] if arg in self._command_categories else \
+                [cmd for cmd in self._command_categories if len(arg) >= 2 and cmd.startswith(arg)]
+            if len(matches) == 1:
+                return self._command_categories[matches[0]] in self.read_only_categories
+        # without any command, task runs its default report
+        return True
+
+    def _select(self, args):
+        helper, args = self._route(args)
+        return (self._helpers if helper is None else [helper]), args
+
+    def _fan_out(self, func, helpers=None):
+        helpers = self._helpers if helpers is None else helpers
+        with self._profiler.track('subprocess'):
+            return dict(zip([helper.label for helper in helpers],
+                            self._executor.map(func, helpers)))
+
+    def fetch(self, *args):
+        helper, args = self._route(args)
+        if helper is not None:
+            with self._profiler.track('subprocess'):
+                return helper.fetch(*args)
+        outputs = self._fan_out(lambda h: h.fetch(*args))
+        return '\n'.join(output for output in outputs.values() if len(output) > 0)
+
+    def fetch_lines(self, *args):
+        helper, args = self._route(args)
+        if helper is not None:
+            with self._profiler.track('subprocess'):
+                return helper.fetch_lines(*args)
+        lines = {}
+        for source_lines in self.fetch_lines_by_source(*args).values():
+            lines.update(dict.fromkeys(source_lines))
+        return list(lines)
+
+    def fetch_lines_by_source(self, *args):
+        helpers, args = self._select(args)
+        return self._fan_out(lambda h: h.fetch_lines(*args), helpers)
+
+    def fetch_ids(self, *args):
+        helpers, args = self._select(args)
+        return [self.qualify(label, tid)
+                for label, tids in self._fan_out(lambda h: h.fetch_ids(*args), helpers).items()
+                for tid in tids]
+
+    def run(self, *args, show=True):
+        helper, args = self._route(args)
+        if helper is None and show and self._is_read_only(args):
+            return self.stream(*args)
+        with self._profiler.track('subprocess'):
+            return (helper or self.primary).run(*args, show=show)
+
+    def spawn(self, *args, out=None):
+        helper, args = self._route(args)
+        return (helper or self.primary).spawn(*args, out=out)
+
+    def stream(self, *args, out=None, max_lines=None):
+        out = sys.stdout if out is None else out
+        helper, args = self._route(args)
+        with self._profiler.track('subprocess'):
+            if helper is not None:
+                return helper.stream(*args, out=out, max_lines=max_lines)
+            # start all reports at once; pending output waits in the pipe buffers
+            with contextlib.ExitStack() as stack:
+                # close and reap every process, even if piping one of them fails
+                procs = [(helper.label, stack.enter_context(helper.spawn(*args, out=out)))
+                         for helper in self._helpers]
+                returncode = 0
+                for label, proc in procs:
+                    out.write(f">>> {label}\n")
+                    returncode = max(returncode, TaskHelper._pipe(proc, out, max_lines))
+                return returncode
+
+    def config(self, *args, confirm=None, verbose=None):
+        with self._profiler.track('subprocess'):
+            return [helper.config(*args, confirm=confirm, verbose=verbose)
+                    for helper in self._helpers]
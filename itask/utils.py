@@ -1,4 +1,5 @@
 import contextlib
+import re
 import os
 import logging
 
@@ -30,3 +31,28 @@ class ObjectDecorator(object):
         # update func reference to method object
         self._func = self._func.__get__(*args, **kwargs)
         return self
+
+
+_duration_units = {
+    1: ['s', 'sec', 'secs', 'second', 'seconds'],
+    60: ['min', 'mins', 'minute', 'minutes'],
+    60 * 60: ['h', 'hr', 'hrs', 'hour', 'hours'],
+    24 * 60 * 60: ['d', 'day', 'days', 'daily'],
+    7 * 24 * 60 * 60: ['w', 'wk', 'wks', 'week', 'weeks', 'weekly'],
+    14 * 24 * 60 * 60: ['fortnight', 'biweekly'],
+    30 * 24 * 60 * 60: ['mo', 'mos', 'mth', 'mths', 'month', 'months', 'monthly'],
+    91 * 24 * 60 * 60: ['q', 'qtr', 'qtrs', 'quarter', 'quarters', 'quarterly'],
+    365 * 24 * 60 * 60: ['y', 'yr', 'yrs', 'year', 'years', 'yearly', 'annual'],
+}
+_duration_seconds = {unit: seconds for seconds, units in _duration_units.items() for unit in units}
+
+
+def parse_duration(value):
+    """Convert a taskwarrior duration, e.g. `1week` or `3d`, to seconds.
+
+    Months, quarters and years are approximated like taskwarrior does (30, 91 and 365 days).
+    """
+    match = re.fullmatch(r'(\d*)([a-zA-Z]+)', value)
+    if match is None or match.group(2).lower() not in _duration_seconds:
+        raise ValueError(f"{value} is not a valid duration")
+    return int(match.group(1) or 1) * _duration_seconds[match.group(2).lower()]
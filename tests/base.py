@@ -6,7 +6,7 @@ from itask import task
 
 
 @contextlib.contextmanager
-def new_task_env():
+def new_task_env(label=None):
     with tempfile.TemporaryDirectory() as tmp_dir:
         rc_overrides = {
             'data.location': os.path.abspath(tmp_dir),
@@ -14,7 +14,8 @@ def new_task_env():
         }
 
         task_helper = task.TaskHelper('task', rc_path=os.path.join(tmp_dir, 'taskrc'),
-                                      rc_overrides=rc_overrides, test_mode=True)
+                                      rc_overrides=rc_overrides, test_mode=True,
+                                      label=label)
 
         task_helper.run()
 
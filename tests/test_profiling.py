@@ -0,0 +1,52 @@
+import os
+import tempfile
+import tracemalloc
+import unittest
+
+from itask.profiling import Profiler
+
+
+class ProfilerTests(unittest.TestCase):
+    def test_disabled(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = Profiler(tmp_dir, enabled=False)
+            with profiler.profile('%iter'):
+                with profiler.track('subprocess'):
+                    pass
+            assert not os.listdir(tmp_dir)
+
+    def test_report(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = Profiler(tmp_dir, enabled=True)
+            for _ in range(2):
+                with profiler.profile('%gtd-review'):
+                    with profiler.track('subprocess'):
+                        sum(range(1000))
+                    with profiler.track('prompt'):
+                        pass
+
+            (session,) = os.listdir(tmp_dir)
+            files = sorted(os.listdir(os.path.join(tmp_dir, session)))
+            assert files == ['gtd-review.prof', 'gtd-review.txt']
+            with open(os.path.join(tmp_dir, session, 'gtd-review.txt')) as fh:
+                report = fh.read()
+            assert 'calls:       2' in report
+            for category in ['subprocess', 'prompt', 'python', 'peak memory']:
+                assert f'{category}:' in report
+
+    def test_peak_memory_per_invocation(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = Profiler(tmp_dir, enabled=True)
+            tracemalloc.start()
+            try:
+                data = bytearray(16 * 1024 * 1024)
+                del data
+                with profiler.profile('%iter'):
+                    pass
+            finally:
+                tracemalloc.stop()
+            assert profiler._stats['%iter']['peak_memory'] < 1024 * 1024
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import time
+import unittest
+
+from itask.utils import parse_duration
+from itask.review import ReviewQueue
+
+from base import new_task_env
+
+
+class ReviewQueueTests(unittest.TestCase):
+    @staticmethod
+    def _new_queue(_task, interval='1week'):
+        _task.config('uda.reviewed.type', 'date')
+        return ReviewQueue(_task, 'reviewed', interval)
+
+    @staticmethod
+    def _descriptions(_task, queue):
+        return [json.loads(_task.fetch('rc.json.array:on', tid, 'export'))[0]['description']
+                for tid in queue]
+
+    def test_order(self):
+        with new_task_env() as _task:
+            queue = self._new_queue(_task)
+            _task.run('add', 'task 1', 'reviewed:now-2weeks')
+            _task.run('add', 'task 2')
+            _task.run('add', 'task 3', 'reviewed:now-3weeks')
+            _task.run('add', 'task 4', 'reviewed:now')
+
+            assert self._descriptions(_task, queue) == ['task 2', 'task 3', 'task 1']
+
+    def test_incremental_update(self):
+        with new_task_env() as _task:
+            queue = self._new_queue(_task)
+            _task.run('add', 'task 1')
+            _task.run('add', 'task 2')
+            assert len(queue) == 2
+
+            _task.run('add', 'task 3')
+            assert len(queue) == 2, "queue may only be updated after invalidation"
+
+            queue.invalidate()
+            assert len(queue) == 3
+
+            _task.run('1', 'modify', 'reviewed:now')
+            _task.run('2', 'done')
+            queue.invalidate()
+            assert len(queue) == 1
+            assert self._descriptions(_task, queue) == ['task 3']
+
+    def test_due_over_time(self):
+        with new_task_env() as _task:
+            queue = self._new_queue(_task, interval='2s')
+            _task.run('add', 'task 1', 'reviewed:now')
+            assert len(queue) == 0
+
+            time.sleep(3)
+            assert len(queue) == 1, "unmodified tasks must become due without invalidation"
+
+    def test_parse_duration(self):
+        assert parse_duration('1week') == 7 * 24 * 60 * 60
+        assert parse_duration('3d') == 3 * 24 * 60 * 60
+        assert parse_duration('month') == 30 * 24 * 60 * 60
+        with self.assertRaises(ValueError):
+            parse_duration('now+1d')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import contextlib
+import io
+import unittest
+
+from itask.task import MultiTaskHelper, TaskError, TaskHelper
+
+from base import new_task_env
+
+
+@contextlib.contextmanager
+def new_multi_task_env(*labels):
+    with contextlib.ExitStack() as stack:
+        yield MultiTaskHelper([stack.enter_context(new_task_env(label)) for label in labels])
+
+
+class TaskHelperTests(unittest.TestCase):
+    def test_stream(self):
+        with new_task_env() as _task:
+            for i in range(5):
+                _task.run('add', f'task {i}')
+
+            out = io.StringIO()
+            _task.stream('_ids', out=out)
+            assert out.getvalue().split() == ['1', '2', '3', '4', '5']
+
+    def test_stream_truncated(self):
+        with new_task_env() as _task:
+            for i in range(5):
+                _task.run('add', f'task {i}')
+
+            out = io.StringIO()
+            _task.stream('_ids', out=out, max_lines=2)
+            lines = out.getvalue().splitlines()
+            assert lines[:2] == ['1', '2']
+            assert lines[2] == '... 3 more lines truncated'
+
+    def test_multi_ids(self):
+        with new_multi_task_env('personal', 'team') as _task:
+            _task.run('personal/', 'add', 'task 1')
+            _task.run('team/', 'add', 'task 2')
+            _task.run('team/', 'add', 'task 3')
+
+            assert _task.fetch_ids() == ['personal/1', 'team/1', 'team/2']
+            assert _task.fetch_ids('team/') == ['team/1', 'team/2']
+            assert _task.fetch_ids('team/2') == ['team/2']
+            assert _task.fetch_lines_by_source('team/', '_ids') == {'team': ['1', '2']}
+            assert _task.fetch('_get', 'team/2.description') == 'task 3'
+
+    def test_multi_routing(self):
+        with new_multi_task_env('personal', 'team') as _task:
+            _task.run('add', 'task 1', '+tag1')
+            _task.run('team/', 'add', 'task 2', '+tag2')
+            _task.run('team/1', 'modify', '+tag1')
+
+            assert _task.fetch_lines_by_source('_ids') == {'personal': ['1'], 'team': ['1']}
+            tags = _task.fetch_lines_by_source('_tags')
+            assert 'tag1' in tags['personal'] and 'tag2' not in tags['personal']
+            assert 'tag1' in tags['team'] and 'tag2' in tags['team']
+            with self.assertRaises(TaskError):
+                _task.run('personal/1', 'team/1', 'info')
+
+    def test_multi_read_only(self):
+        with new_multi_task_env('personal', 'team') as _task:
+            for args in [(), ('list',), ('+tag1', 'next'), ('projects',), ('li',)]:
+                assert _task._is_read_only(args), f"{args} must fan out"
+            for args in [('add', 'list'), ('1', 'modify', 'x'), ('config', 'color', 'off')]:
+                assert not _task._is_read_only(args), f"{args} must run on the primary database"
+
+    def test_multi_routing_free_text(self):
+        _task = MultiTaskHelper([TaskHelper(label='personal'), TaskHelper(label='team')])
+
+        tids = ['team/1', 'personal/1a2b3c4d', 'team/2']
+        assert _task.split_by_source(tids) == [['team/1', 'team/2'], ['personal/1a2b3c4d']]
+
+        helper, args = _task._route(['add', 'personal/family errands'])
+        assert helper is None
+        assert args == ['add', 'personal/family errands']
+
+        helper, args = _task._route(['team/', 'add', 'personal/family errands'])
+        assert helper.label == 'team'
+        assert args == ['add', 'personal/family errands']
+
+        for tid, routed in [('team/3', '3'), ('team/3.description', '3.description'),
+                            ('team/1a2b3c4d', '1a2b3c4d')]:
+            helper, args = _task._route([tid, 'info'])
+            assert helper.label == 'team'
+            assert args == [routed, 'info']
+
+
+if __name__ == '__main__':
+    unittest.main()